@@ -1,11 +1,96 @@
+import math
+import os
+from dataclasses import dataclass
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
+from numba import njit, prange
+from pandas.api.types import is_datetime64_any_dtype
+
+# Optional Modin backend (USE_MODIN=1): same pandas API, but reads, masks and
+# column operations are spread across all cores. The Numba kernels keep
+# running on plain NumPy arrays either way.
+if os.environ.get("USE_MODIN") == "1":
+    try:
+        import modin.pandas as pd
+    except ImportError:
+        print("USE_MODIN is set but Modin is not installed, using pandas")
+
+# Copy-on-Write: filtered frames share memory with their parent until they are
+# modified, so adding feature columns needs no defensive df.copy()
+pd.set_option("mode.copy_on_write", True)
 
 # For tracking what we remove
 cleaning_log = []
 
+# Explicit column types for the raw CSV, kept as narrow as the data allows
+# (float32 is plenty for NYC coordinates, vendor and passenger fit in int8,
+# and the Y/N flag is stored as category codes rather than strings).
+# Integer columns use pandas' nullable types so rows with blank values still
+# load and are reported, instead of failing the integer cast.
+SCHEMA = {
+    "vendor_id": "Int8",
+    "store_and_fwd_flag": "category",
+    "pickup_longitude": "float32",
+    "pickup_latitude": "float32",
+    "dropoff_longitude": "float32",
+    "dropoff_latitude": "float32",
+    "trip_duration": "Int32",
+    "passenger_count": "Int8",
+}
+DATETIME_COLUMNS = ["pickup_datetime", "dropoff_datetime"]
+
+# Columns that must be present for a trip to be usable
+CRITICAL_COLUMNS = [
+    "pickup_datetime",
+    "dropoff_datetime",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+    "trip_duration",
+    "passenger_count",
+]
+# Plain NumPy types for the integer critical columns once rows missing them
+# have been dropped
+CRITICAL_INT_DTYPES = {"trip_duration": "int32", "passenger_count": "int8"}
+# Columns carried past the quality check; store_and_fwd_flag is only inspected
+KEEP_COLUMNS = ["id", "vendor_id"] + CRITICAL_COLUMNS
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Rows per chunk when scanning the frame for the data quality report
+QUALITY_CHUNK_ROWS = 1_000_000
+
+# Bins for the derived category features. Time of day splits at 6, 12, 17
+# and 21, with the first and last bins both being "night"; it is expanded
+# into a per-hour lookup table of category codes.
+TIME_OF_DAY_EDGES = np.array([6, 12, 17, 21])
+TIME_OF_DAY_LABELS = ["night", "morning", "afternoon", "evening"]
+TIME_OF_DAY_BY_HOUR = np.array([0, 1, 2, 3, 0], dtype=np.int8)[
+    np.searchsorted(TIME_OF_DAY_EDGES, np.arange(24), side="right")
+]
+SPEED_EDGES = np.array([5, 15, 25, 40])
+SPEED_LABELS = ["very_slow", "slow", "moderate", "fast", "very_fast"]
+# 1 for the rush hours (7-9am and 5-7pm), indexed by hour of day
+RUSH_HOUR_BY_HOUR = np.isin(np.arange(24), [7, 8, 17, 18]).astype(np.int8)
+DAY_NAMES = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+# Radius of Earth in miles
+EARTH_RADIUS_MILES = 3959.0
+DEGREES_TO_RADIANS = math.pi / 180
+
+# Trips faster than this are treated as GPS or meter errors
+MAX_SPEED_MPH = 100.0
+
 
 def log_step(message):
     """Helper function to log cleaning steps"""
@@ -13,14 +98,37 @@ def log_step(message):
     cleaning_log.append(message)
 
 
+def read_taxi_csv(filepath):
+    """Read the taxi CSV with typed columns, using the PyArrow parser if installed"""
+    try:
+        return pd.read_csv(
+            filepath,
+            engine="pyarrow",
+            dtype=SCHEMA,
+            parse_dates=DATETIME_COLUMNS,
+            date_format=DATETIME_FORMAT,
+        )
+    except ImportError:
+        # PyArrow not installed, fall back to the default C parser
+        return pd.read_csv(
+            filepath,
+            engine="c",
+            dtype=SCHEMA,
+            parse_dates=DATETIME_COLUMNS,
+            date_format=DATETIME_FORMAT,
+            low_memory=False,
+            cache_dates=True,
+        )
+
+
 def load_data(filepath):
     """Load the raw taxi data"""
     print("Loading data...")
-    df = pd.read_csv(filepath)
+    df = read_taxi_csv(filepath)
 
     log_step(f"Initial dataset size: {len(df)} rows, {len(df.columns)} columns")
     log_step(f"Columns: {list(df.columns)}")
-    log_step(f"Memory usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+    log_step(f"Memory usage: {df.memory_usage().sum() / 1024**2:.2f} MB")
 
     # Show first few rows
     print("\nFirst 5 rows:")
@@ -37,6 +145,107 @@ def load_data(filepath):
     return df
 
 
+@dataclass
+class QualityCounters:
+    """Running totals for the value range checks in check_data_quality"""
+
+    negative_durations: int = 0
+    zero_durations: int = 0
+    short_trips: int = 0
+    long_trips: int = 0
+    extremely_long_trips: int = 0
+    duration_min: float = math.nan
+    duration_max: float = math.nan
+    duration_sum: float = 0
+    duration_count: int = 0
+    zero_passengers: int = 0
+    invalid_passengers: int = 0
+    suspicious_passengers: int = 0
+    passenger_min: float = math.nan
+    passenger_max: float = math.nan
+    pickup_lat_min: float = math.nan
+    pickup_lat_max: float = math.nan
+    pickup_lon_min: float = math.nan
+    pickup_lon_max: float = math.nan
+    pickup_lat_outside: int = 0
+    pickup_lon_outside: int = 0
+    dropoff_lat_min: float = math.nan
+    dropoff_lat_max: float = math.nan
+    dropoff_lon_min: float = math.nan
+    dropoff_lon_max: float = math.nan
+    dropoff_lat_outside: int = 0
+    dropoff_lon_outside: int = 0
+
+
+def value_range(values):
+    """Return the min and max of an array, or NaN for both if it is empty"""
+    if values.size == 0:
+        return math.nan, math.nan
+    return values.min(), values.max()
+
+
+def count_value_ranges(df, chunk_rows=QUALITY_CHUNK_ROWS):
+    """Collect all value range checks in a single pass over row chunks"""
+    c = QualityCounters()
+
+    # Each column is checked over its own non-missing values, the way pandas
+    # reductions skip NaN per column. The arrays are pulled out once; each
+    # chunk is then a cheap slice view, empty once a shorter column runs out.
+    durations = df["trip_duration"].dropna().to_numpy()
+    passenger_counts = df["passenger_count"].dropna().to_numpy()
+    pickup_lats = df["pickup_latitude"].dropna().to_numpy()
+    pickup_lons = df["pickup_longitude"].dropna().to_numpy()
+    dropoff_lats = df["dropoff_latitude"].dropna().to_numpy()
+    dropoff_lons = df["dropoff_longitude"].dropna().to_numpy()
+
+    c.duration_count = len(durations)
+    c.duration_min, c.duration_max = value_range(durations)
+    c.passenger_min, c.passenger_max = value_range(passenger_counts)
+    c.pickup_lat_min, c.pickup_lat_max = value_range(pickup_lats)
+    c.pickup_lon_min, c.pickup_lon_max = value_range(pickup_lons)
+    c.dropoff_lat_min, c.dropoff_lat_max = value_range(dropoff_lats)
+    c.dropoff_lon_min, c.dropoff_lon_max = value_range(dropoff_lons)
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = slice(start, start + chunk_rows)
+
+        duration = durations[chunk]
+        c.negative_durations += np.count_nonzero(duration < 0)
+        c.zero_durations += np.count_nonzero(duration == 0)
+        c.short_trips += np.count_nonzero(duration < 60)
+        c.long_trips += np.count_nonzero(duration > 10800)
+        c.extremely_long_trips += np.count_nonzero(duration > 86400)
+        c.duration_sum += int(duration.sum(dtype=np.int64))
+
+        passengers = passenger_counts[chunk]
+        c.zero_passengers += np.count_nonzero(passengers == 0)
+        c.invalid_passengers += np.count_nonzero(passengers < 1)
+        c.suspicious_passengers += np.count_nonzero(passengers > 6)
+
+        # NYC approximate bounds: lat 40.5-41.0, lon -74.3 to -73.7
+        lat = pickup_lats[chunk]
+        lon = pickup_lons[chunk]
+        c.pickup_lat_outside += np.count_nonzero((lat < 40.5) | (lat > 41.0))
+        c.pickup_lon_outside += np.count_nonzero((lon < -74.3) | (lon > -73.7))
+
+        lat = dropoff_lats[chunk]
+        lon = dropoff_lons[chunk]
+        c.dropoff_lat_outside += np.count_nonzero((lat < 40.5) | (lat > 41.0))
+        c.dropoff_lon_outside += np.count_nonzero((lon < -74.3) | (lon > -73.7))
+
+    return c
+
+
+def iqr_bounds(values):
+    """Return the 1.5 * IQR outlier bounds, computing both quartiles in one call"""
+    if values.size == 0:
+        # Like Series.quantile, no values means no bounds
+        return math.nan, math.nan
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+
 def check_data_quality(df):
     """Identify data quality issues"""
     print("\n" + "=" * 50)
@@ -59,35 +268,37 @@ def check_data_quality(df):
     if missing_df["Missing_Count"].sum() == 0:
         print("   No missing values found!")
 
-    # 2. Duplicates
-    duplicates = df.duplicated().sum()
+    # 2. Duplicates (by trip id when available)
+    duplicates = df.duplicated(subset=["id"] if "id" in df.columns else None).sum()
     print(f"\n2. Duplicate rows: {duplicates}")
 
     # 3. Check specific columns for issues
     print("\n3. Value Range Checks:")
 
+    counts = count_value_ranges(df)
+
     # Check trip_duration (in seconds)
     print(f"\n   TRIP DURATION:")
-    print(f"   - Negative durations: {(df['trip_duration'] < 0).sum()}")
-    print(f"   - Zero durations: {(df['trip_duration'] == 0).sum()}")
-    print(f"   - Very short trips (<60 sec): {(df['trip_duration'] < 60).sum()}")
-    print(f"   - Very long trips (>3 hours): {(df['trip_duration'] > 10800).sum()}")
-    print(
-        f"   - Extremely long trips (>24 hours): {(df['trip_duration'] > 86400).sum()}"
-    )
-    print(
-        f"   - Range: {df['trip_duration'].min()} to {df['trip_duration'].max()} seconds"
-    )
-    print(
-        f"   - Mean: {df['trip_duration'].mean():.2f} seconds ({df['trip_duration'].mean()/60:.2f} minutes)"
+    print(f"   - Negative durations: {counts.negative_durations}")
+    print(f"   - Zero durations: {counts.zero_durations}")
+    print(f"   - Very short trips (<60 sec): {counts.short_trips}")
+    print(f"   - Very long trips (>3 hours): {counts.long_trips}")
+    print(f"   - Extremely long trips (>24 hours): {counts.extremely_long_trips}")
+    print(f"   - Range: {counts.duration_min} to {counts.duration_max} seconds")
+    # NaN when no duration is present, as Series.mean reports
+    duration_mean = (
+        counts.duration_sum / counts.duration_count
+        if counts.duration_count
+        else math.nan
     )
+    print(f"   - Mean: {duration_mean:.2f} seconds ({duration_mean/60:.2f} minutes)")
 
     # Check passenger_count
     print(f"\n   PASSENGER COUNT:")
-    print(f"   - Zero passengers: {(df['passenger_count'] == 0).sum()}")
-    print(f"   - Invalid counts (<1): {(df['passenger_count'] < 1).sum()}")
-    print(f"   - Suspicious counts (>6): {(df['passenger_count'] > 6).sum()}")
-    print(f"   - Range: {df['passenger_count'].min()} to {df['passenger_count'].max()}")
+    print(f"   - Zero passengers: {counts.zero_passengers}")
+    print(f"   - Invalid counts (<1): {counts.invalid_passengers}")
+    print(f"   - Suspicious counts (>6): {counts.suspicious_passengers}")
+    print(f"   - Range: {counts.passenger_min} to {counts.passenger_max}")
     print(f"   - Distribution:")
     print(df["passenger_count"].value_counts().sort_index())
 
@@ -97,31 +308,27 @@ def check_data_quality(df):
     # Pickup coordinates
     print(f"   Pickup:")
     print(
-        f"   - Latitude range: {df['pickup_latitude'].min():.6f} to {df['pickup_latitude'].max():.6f}"
+        f"   - Latitude range: {counts.pickup_lat_min:.6f} to {counts.pickup_lat_max:.6f}"
     )
     print(
-        f"   - Longitude range: {df['pickup_longitude'].min():.6f} to {df['pickup_longitude'].max():.6f}"
+        f"   - Longitude range: {counts.pickup_lon_min:.6f} to {counts.pickup_lon_max:.6f}"
     )
+    print(f"   - Outside NYC latitude bounds (40.5-41.0): {counts.pickup_lat_outside}")
     print(
-        f"   - Outside NYC latitude bounds (40.5-41.0): {((df['pickup_latitude'] < 40.5) | (df['pickup_latitude'] > 41.0)).sum()}"
-    )
-    print(
-        f"   - Outside NYC longitude bounds (-74.3 to -73.7): {((df['pickup_longitude'] < -74.3) | (df['pickup_longitude'] > -73.7)).sum()}"
+        f"   - Outside NYC longitude bounds (-74.3 to -73.7): {counts.pickup_lon_outside}"
     )
 
     # Dropoff coordinates
     print(f"   Dropoff:")
     print(
-        f"   - Latitude range: {df['dropoff_latitude'].min():.6f} to {df['dropoff_latitude'].max():.6f}"
-    )
-    print(
-        f"   - Longitude range: {df['dropoff_longitude'].min():.6f} to {df['dropoff_longitude'].max():.6f}"
+        f"   - Latitude range: {counts.dropoff_lat_min:.6f} to {counts.dropoff_lat_max:.6f}"
     )
     print(
-        f"   - Outside NYC latitude bounds (40.5-41.0): {((df['dropoff_latitude'] < 40.5) | (df['dropoff_latitude'] > 41.0)).sum()}"
+        f"   - Longitude range: {counts.dropoff_lon_min:.6f} to {counts.dropoff_lon_max:.6f}"
     )
+    print(f"   - Outside NYC latitude bounds (40.5-41.0): {counts.dropoff_lat_outside}")
     print(
-        f"   - Outside NYC longitude bounds (-74.3 to -73.7): {((df['dropoff_longitude'] < -74.3) | (df['dropoff_longitude'] > -73.7)).sum()}"
+        f"   - Outside NYC longitude bounds (-74.3 to -73.7): {counts.dropoff_lon_outside}"
     )
 
     # Check vendor_id
@@ -139,17 +346,13 @@ def check_data_quality(df):
     print("=" * 50)
 
     # Trip duration outliers
-    Q1_duration = df["trip_duration"].quantile(0.25)
-    Q3_duration = df["trip_duration"].quantile(0.75)
-    IQR_duration = Q3_duration - Q1_duration
-    lower_duration = Q1_duration - 1.5 * IQR_duration
-    upper_duration = Q3_duration + 1.5 * IQR_duration
-    outliers_duration = (
-        (df["trip_duration"] < lower_duration) | (df["trip_duration"] > upper_duration)
-    ).sum()
-    print(
-        f"   Trip duration outliers: {outliers_duration} ({100*outliers_duration/len(df):.2f}%)"
+    trip_duration = df["trip_duration"].dropna().to_numpy()
+    lower_duration, upper_duration = iqr_bounds(trip_duration)
+    outliers_duration = np.count_nonzero(
+        (trip_duration < lower_duration) | (trip_duration > upper_duration)
     )
+    outliers_pct = 100 * outliers_duration / len(df) if len(df) else math.nan
+    print(f"   Trip duration outliers: {outliers_duration} ({outliers_pct:.2f}%)")
     print(f"   Normal range: {lower_duration:.0f} to {upper_duration:.0f} seconds")
 
     return missing_df
@@ -163,20 +366,10 @@ def clean_missing_values(df):
 
     initial_rows = len(df)
 
-    # Check for any missing values in critical columns
-    critical_columns = [
-        "pickup_datetime",
-        "dropoff_datetime",
-        "pickup_longitude",
-        "pickup_latitude",
-        "dropoff_longitude",
-        "dropoff_latitude",
-        "trip_duration",
-        "passenger_count",
-    ]
-
     # Remove rows with missing critical values
-    df = df.dropna(subset=critical_columns)
+    df = df.dropna(subset=CRITICAL_COLUMNS)
+    # Nothing is missing any more, so the integer columns can drop their masks
+    df = df.astype(CRITICAL_INT_DTYPES)
 
     removed = initial_rows - len(df)
     log_step(f"Removed {removed} rows with missing critical values")
@@ -192,7 +385,8 @@ def remove_duplicates(df):
     print("=" * 50)
 
     initial_rows = len(df)
-    df = df.drop_duplicates()
+    # Trips are keyed by id, so hashing that single column is enough
+    df = df.drop_duplicates(subset=["id"] if "id" in df.columns else None)
     removed = initial_rows - len(df)
 
     log_step(f"Removed {removed} duplicate rows")
@@ -209,45 +403,50 @@ def remove_invalid_values(df):
 
     initial_rows = len(df)
 
-    # Remove zero or negative trip durations
-    before = len(df)
-    df = df[df["trip_duration"] > 0]
-    log_step(f"Removed {before - len(df)} rows with zero or negative trip duration")
-
-    # Remove extremely long trips (over 24 hours = 86400 seconds)
-    before = len(df)
-    df = df[df["trip_duration"] <= 86400]
-    log_step(f"Removed {before - len(df)} rows with trip duration > 24 hours")
-
-    # Remove very short trips (less than 10 seconds - likely errors)
-    before = len(df)
-    df = df[df["trip_duration"] >= 10]
-    log_step(f"Removed {before - len(df)} rows with trip duration < 10 seconds")
-
-    # Remove invalid passenger counts (0 or more than 6)
-    before = len(df)
-    df = df[(df["passenger_count"] >= 1) & (df["passenger_count"] <= 6)]
-    log_step(f"Removed {before - len(df)} rows with invalid passenger counts (0 or >6)")
+    trip_duration = df["trip_duration"].to_numpy()
+    passenger_count = df["passenger_count"].to_numpy()
+    pickup_lat = df["pickup_latitude"].to_numpy()
+    pickup_lon = df["pickup_longitude"].to_numpy()
+    dropoff_lat = df["dropoff_latitude"].to_numpy()
+    dropoff_lon = df["dropoff_longitude"].to_numpy()
 
-    # Remove coordinates outside NYC bounds
+    # Each rule is evaluated on the raw arrays and folded into one mask, so the
+    # frame is only copied once. Counts are taken against the rows still kept
+    # so the log matches applying the rules one after another.
     # NYC approximate bounds: lat 40.5-41.0, lon -74.3 to -73.7
-    before = len(df)
-    df = df[
-        (df["pickup_latitude"] >= 40.5)
-        & (df["pickup_latitude"] <= 41.0)
-        & (df["pickup_longitude"] >= -74.3)
-        & (df["pickup_longitude"] <= -73.7)
+    rules = [
+        ("zero or negative trip duration", trip_duration > 0),
+        ("trip duration > 24 hours", trip_duration <= 86400),
+        ("trip duration < 10 seconds", trip_duration >= 10),
+        (
+            "invalid passenger counts (0 or >6)",
+            (passenger_count >= 1) & (passenger_count <= 6),
+        ),
+        (
+            "invalid pickup coordinates",
+            (pickup_lat >= 40.5)
+            & (pickup_lat <= 41.0)
+            & (pickup_lon >= -74.3)
+            & (pickup_lon <= -73.7),
+        ),
+        (
+            "invalid dropoff coordinates",
+            (dropoff_lat >= 40.5)
+            & (dropoff_lat <= 41.0)
+            & (dropoff_lon >= -74.3)
+            & (dropoff_lon <= -73.7),
+        ),
     ]
-    log_step(f"Removed {before - len(df)} rows with invalid pickup coordinates")
 
-    before = len(df)
-    df = df[
-        (df["dropoff_latitude"] >= 40.5)
-        & (df["dropoff_latitude"] <= 41.0)
-        & (df["dropoff_longitude"] >= -74.3)
-        & (df["dropoff_longitude"] <= -73.7)
-    ]
-    log_step(f"Removed {before - len(df)} rows with invalid dropoff coordinates")
+    mask = np.ones(initial_rows, dtype=bool)
+    kept = initial_rows
+    for reason, condition in rules:
+        mask &= condition
+        remaining = np.count_nonzero(mask)
+        log_step(f"Removed {kept - remaining} rows with {reason}")
+        kept = remaining
+
+    df = df[mask]
 
     total_removed = initial_rows - len(df)
     log_step(f"Total removed in this step: {total_removed}")
@@ -267,20 +466,15 @@ def remove_outliers(df):
     # Remove trip_duration outliers
     before = len(df)
 
-    # Calculate IQR for trip_duration
-    Q1 = df["trip_duration"].quantile(0.25)
-    Q3 = df["trip_duration"].quantile(0.75)
-    IQR = Q3 - Q1
-
-    # Define bounds (using 1.5 * IQR)
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+    # Calculate IQR bounds for trip_duration
+    trip_duration = df["trip_duration"].to_numpy()
+    lower_bound, upper_bound = iqr_bounds(trip_duration)
 
     # Make sure lower bound is at least 0
     lower_bound = max(0, lower_bound)
 
     # Filter
-    df = df[(df["trip_duration"] >= lower_bound) & (df["trip_duration"] <= upper_bound)]
+    df = df[(trip_duration >= lower_bound) & (trip_duration <= upper_bound)]
 
     removed = before - len(df)
     log_step(f"Removed {removed} outliers from trip_duration")
@@ -295,6 +489,127 @@ def remove_outliers(df):
     return df
 
 
+@njit(fastmath=True, cache=True)
+def _haversine_miles(lat1, lon1, lat2, lon2):
+    """Haversine distance between two points on Earth in miles"""
+    phi1 = lat1 * DEGREES_TO_RADIANS
+    phi2 = lat2 * DEGREES_TO_RADIANS
+    dlat = phi2 - phi1
+    dlon = (lon2 - lon1) * DEGREES_TO_RADIANS
+    a = (
+        math.sin(dlat / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlon / 2) ** 2
+    )
+    # Rounding can push a just past 1 for near-antipodal points
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(a, 1.0)))
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _trip_metrics_kernel(lat1, lon1, lat2, lon2, duration, distance, speed, keep):
+    """Fill distance, speed and the speed filter mask in one pass per trip"""
+    for i in prange(lat1.shape[0]):
+        d = _haversine_miles(lat1[i], lon1[i], lat2[i], lon2[i])
+        distance[i] = d
+        # Trips without a positive duration get a speed of 0
+        s = d * 3600.0 / duration[i] if duration[i] > 0 else 0.0
+        speed[i] = s
+        keep[i] = s <= MAX_SPEED_MPH
+
+
+def trip_metrics(df):
+    """Return trip distance (miles), average speed (mph) and a realistic-speed mask"""
+    lat1, lon1, lat2, lon2 = (
+        np.ascontiguousarray(df[col], dtype=np.float32)
+        for col in (
+            "pickup_latitude",
+            "pickup_longitude",
+            "dropoff_latitude",
+            "dropoff_longitude",
+        )
+    )
+    duration = np.ascontiguousarray(df["trip_duration"])
+    n = lat1.shape[0]
+    distance = np.empty(n, dtype=np.float32)
+    speed = np.empty(n, dtype=np.float64)
+    keep = np.empty(n, dtype=np.bool_)
+    _trip_metrics_kernel(lat1, lon1, lat2, lon2, duration, distance, speed, keep)
+    return distance, speed, keep
+
+
+@njit(parallel=True, cache=True)
+def _featurize_kernel(
+    seconds,
+    speed,
+    time_of_day_by_hour,
+    rush_hour_by_hour,
+    speed_edges,
+    hour,
+    day_of_week,
+    month,
+    is_weekend,
+    time_of_day,
+    is_rush_hour,
+    speed_category,
+):
+    """Fill every temporal and category feature from Unix timestamps and speed"""
+    for i in prange(seconds.shape[0]):
+        days = seconds[i] // 86400
+        h = (seconds[i] // 3600) % 24
+        hour[i] = h
+        # 1970-01-01 was a Thursday
+        dow = (days + 3) % 7
+        day_of_week[i] = dow
+        is_weekend[i] = 1 if dow >= 5 else 0
+        time_of_day[i] = time_of_day_by_hour[h]
+        is_rush_hour[i] = rush_hour_by_hour[h]
+        # Month from days since epoch (Howard Hinnant's civil_from_days)
+        day_of_era = (days + 719468) % 146097
+        year_of_era = (
+            day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+        ) // 365
+        day_of_year = day_of_era - (
+            365 * year_of_era + year_of_era // 4 - year_of_era // 100
+        )
+        month_index = (5 * day_of_year + 2) // 153
+        month[i] = month_index + 3 if month_index < 10 else month_index - 9
+        # Same bins as np.searchsorted(speed_edges, speed, side="right")
+        code = 0
+        for edge in speed_edges:
+            if speed[i] >= edge:
+                code += 1
+        speed_category[i] = code
+
+
+def featurize(datetimes, speed):
+    """Return the per-trip temporal and category features as int8 arrays
+
+    Keys are the output column names; time_of_day and speed_category hold
+    category codes into TIME_OF_DAY_LABELS and SPEED_LABELS.
+    """
+    seconds = np.asarray(datetimes).astype("datetime64[s]", copy=False).view(np.int64)
+    features = {
+        name: np.empty(seconds.shape[0], dtype=np.int8)
+        for name in [
+            "pickup_hour",
+            "pickup_day_of_week",
+            "pickup_month",
+            "is_weekend",
+            "time_of_day",
+            "is_rush_hour",
+            "speed_category",
+        ]
+    }
+    _featurize_kernel(
+        seconds,
+        np.asarray(speed, dtype=np.float64),
+        TIME_OF_DAY_BY_HOUR,
+        RUSH_HOUR_BY_HOUR,
+        SPEED_EDGES.astype(np.float64),
+        *features.values(),
+    )
+    return features
+
+
 def create_derived_features(df):
     """Create new calculated columns"""
     print("\n" + "=" * 50)
@@ -303,104 +618,72 @@ def create_derived_features(df):
 
     initial_rows = len(df)
 
-    # Convert datetime columns
-    df["pickup_datetime"] = pd.to_datetime(df["pickup_datetime"])
-    df["dropoff_datetime"] = pd.to_datetime(df["dropoff_datetime"])
+    # Convert datetime columns (load_data already parses them while reading)
+    for col in DATETIME_COLUMNS:
+        if not is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format=DATETIME_FORMAT, cache=True)
     log_step("Converted datetime columns to datetime objects")
 
     # Feature 1: Trip duration in minutes (convert from seconds)
     df["trip_duration_minutes"] = df["trip_duration"] / 60
     log_step("Created feature: trip_duration_minutes")
 
+    # Features 2 and 3 and the speed filter come out of one fused pass
+    distance, speed, keep = trip_metrics(df)
+
     # Feature 2: Trip distance (Haversine formula)
     # This calculates straight-line distance between pickup and dropoff
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calculate distance between two points on Earth in miles"""
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
-        c = 2 * np.arcsin(np.sqrt(a))
-
-        # Radius of Earth in miles
-        r = 3959
-
-        return c * r
-
-    df["trip_distance_miles"] = haversine_distance(
-        df["pickup_latitude"],
-        df["pickup_longitude"],
-        df["dropoff_latitude"],
-        df["dropoff_longitude"],
-    )
+    df["trip_distance_miles"] = distance
     log_step("Created feature: trip_distance_miles (Haversine distance)")
 
     # Feature 3: Average speed (mph)
-    df["avg_speed_mph"] = df["trip_distance_miles"] / (df["trip_duration"] / 3600)
-    df["avg_speed_mph"] = df["avg_speed_mph"].replace([np.inf, -np.inf], 0)
+    df["avg_speed_mph"] = speed
 
     # Remove unrealistic speeds (over 100 mph is suspicious)
     before = len(df)
-    df = df[df["avg_speed_mph"] <= 100]
+    df = df[keep]
     log_step(f"Removed {before - len(df)} rows with unrealistic speeds (>100 mph)")
     log_step("Created feature: avg_speed_mph")
 
+    # Features 4-11 all come out of one compiled pass over pickup time and speed
+    features = featurize(df["pickup_datetime"], df["avg_speed_mph"])
+
     # Feature 4: Hour of day
-    df = df.copy()
-    df["pickup_hour"] = df["pickup_datetime"].dt.hour
+    df["pickup_hour"] = features["pickup_hour"]
     log_step("Created feature: pickup_hour")
 
     # Feature 5: Day of week (0=Monday, 6=Sunday)
-    df["pickup_day_of_week"] = df["pickup_datetime"].dt.dayofweek
+    df["pickup_day_of_week"] = features["pickup_day_of_week"]
     log_step("Created feature: pickup_day_of_week")
 
     # Feature 6: Day name
-    df["pickup_day_name"] = df["pickup_datetime"].dt.day_name()
+    df["pickup_day_name"] = pd.Categorical.from_codes(
+        features["pickup_day_of_week"], categories=DAY_NAMES
+    )
     log_step("Created feature: pickup_day_name")
 
     # Feature 7: Month
-    df["pickup_month"] = df["pickup_datetime"].dt.month
+    df["pickup_month"] = features["pickup_month"]
     log_step("Created feature: pickup_month")
 
     # Feature 8: Is weekend?
-    df["is_weekend"] = df["pickup_day_of_week"].isin([5, 6]).astype(int)
+    df["is_weekend"] = features["is_weekend"]
     log_step("Created feature: is_weekend")
 
     # Feature 9: Time of day category
-    def categorize_time(hour):
-        if 6 <= hour < 12:
-            return "morning"
-        elif 12 <= hour < 17:
-            return "afternoon"
-        elif 17 <= hour < 21:
-            return "evening"
-        else:
-            return "night"
-
-    df["time_of_day"] = df["pickup_hour"].apply(categorize_time)
+    df["time_of_day"] = pd.Categorical.from_codes(
+        features["time_of_day"], categories=TIME_OF_DAY_LABELS
+    )
     log_step("Created feature: time_of_day")
 
     # Feature 10: Rush hour flag (morning: 7-9am, evening: 5-7pm)
-    df["is_rush_hour"] = df["pickup_hour"].isin([7, 8, 17, 18]).astype(int)
+    df["is_rush_hour"] = features["is_rush_hour"]
     log_step("Created feature: is_rush_hour")
 
     # Feature 11: Trip speed category
-    def categorize_speed(speed):
-        if speed < 5:
-            return "very_slow"
-        elif speed < 15:
-            return "slow"
-        elif speed < 25:
-            return "moderate"
-        elif speed < 40:
-            return "fast"
-        else:
-            return "very_fast"
-
-    df["speed_category"] = df["avg_speed_mph"].apply(categorize_speed)
+    df["speed_category"] = pd.Categorical.from_codes(
+        features["speed_category"], categories=SPEED_LABELS
+    )
     log_step("Created feature: speed_category")
 
     log_step(f"Total features in dataset: {len(df.columns)}")
@@ -409,15 +692,27 @@ def create_derived_features(df):
     return df
 
 
-def save_cleaned_data(df, output_path):
+def save_cleaned_data(df, output_path, csv_copy=False):
     """Save the cleaned dataset"""
     print("\n" + "=" * 50)
     print("STEP 6: Saving Cleaned Data")
     print("=" * 50)
 
-    # Save to CSV
-    df.to_csv(output_path, index=False)
+    # Save to Parquet (typed and columnar, much faster to reload than CSV)
+    df.to_parquet(
+        output_path,
+        engine="pyarrow",
+        compression="snappy",
+        row_group_size=256_000,
+        index=False,
+    )
     log_step(f"Saved cleaned data to: {output_path}")
+
+    # Optional compressed CSV copy for inspecting the data by hand
+    if csv_copy:
+        csv_path = os.path.splitext(output_path)[0] + ".csv.gz"
+        df.to_csv(csv_path, index=False)
+        log_step(f"Saved CSV copy to: {csv_path}")
     log_step(f"Final dataset size: {len(df)} rows, {len(df.columns)} columns")
 
     # Save cleaning log
@@ -460,6 +755,12 @@ def main():
     # Check quality
     check_data_quality(df)
 
+    # Drop columns that are not used after the quality check. id is optional:
+    # without it, duplicates are detected on whole rows instead
+    dropped = [col for col in df.columns if col not in KEEP_COLUMNS]
+    df = df[[col for col in KEEP_COLUMNS if col in df.columns]]
+    log_step(f"Dropped columns not used downstream: {dropped}")
+
     # Record initial count
     initial_count = len(df)
 
@@ -471,7 +772,7 @@ def main():
     df = create_derived_features(df)
 
     # Save
-    df = save_cleaned_data(df, "../data/cleaned/cleaned_taxi_data.csv")
+    df = save_cleaned_data(df, "../data/cleaned/cleaned_taxi_data.parquet")
 
     # Final summary
     print("\n" + "=" * 50)
@@ -1,16 +1,34 @@
-import sqlite3
+import asyncio
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+import aiosqlite
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 version = "v1"
 
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # aiosqlite runs each connection on its own thread; close them on shutdown
+    await db_pool.close()
+
+
 app = FastAPI(
     title="NYC Taxi Trip Data API",
     description="API for exploring NYC taxi trip data and urban mobility patterns",
     version=version,
+    lifespan=lifespan,
+    # Rows come out of SQLite already typed, so responses skip Pydantic
+    # validation and are serialized straight to JSON by orjson
+    default_response_class=ORJSONResponse,
 )
 
 # origins = ["http://localhost:5173", "http://127.0.0.1:5500/frontend/index.html"]
@@ -49,6 +67,11 @@ class TripBase(BaseModel):
     speed_category: Optional[str] = None
 
 
+class TripPage(BaseModel):
+    trips: List[TripBase]
+    next_cursor: Optional[str] = None
+
+
 class TripDetail(TripBase):
     pickup_longitude: float
     pickup_latitude: float
@@ -68,18 +91,193 @@ class StatsResponse(BaseModel):
     avg_passengers: float
 
 
-# Database helper function
-def get_db_connection():
-    """Create database connection"""
-    # conn = sqlite3.connect(DB_PATH)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-    return conn
+# Connection pool settings
+POOL_SIZE = 8
+CONNECTION_PRAGMAS = [
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB page cache per connection
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped reads
+]
+# Prepared statements kept per connection, keyed by SQL text
+CACHED_STATEMENTS = 256
+
+
+# SQL is kept in module-level constants so every request sends the same
+# text and hits the long-lived connections' prepared statement cache
+TRIPS_QUERY = """
+    SELECT 
+        t.id, t.vendor_id, t.pickup_datetime, t.dropoff_datetime,
+        t.passenger_count, t.trip_duration_minutes, t.trip_distance_miles,
+        t.avg_speed_mph, tod.name as time_of_day, sc.name as speed_category
+    FROM trips t
+    LEFT JOIN dim_time_of_day tod ON tod.id = t.time_of_day_id
+    LEFT JOIN dim_speed_category sc ON sc.id = t.speed_category_id
+    WHERE 1=1
+"""
+
+# Optional get_trips filters; a filter's position is its bit in the mask.
+# The unary + keeps SQLite off the filter columns' indexes, so every page
+# walks the id index from after_id and stops after `limit` matches instead
+# of collecting and sorting every matching row
+TRIP_FILTERS = [
+    " AND +t.time_of_day_id = (SELECT id FROM dim_time_of_day WHERE name = ?)",
+    " AND +t.speed_category_id = (SELECT id FROM dim_speed_category WHERE name = ?)",
+    " AND +t.trip_distance_miles >= ?",
+    " AND +t.trip_distance_miles <= ?",
+    " AND t.id > ?",
+]
+
+# Every filter combination is assembled once at import and looked up by
+# bitmask, so requests never build SQL strings
+TRIPS_QUERIES = [
+    TRIPS_QUERY
+    + "".join(clause for bit, clause in enumerate(TRIP_FILTERS) if mask >> bit & 1)
+    + " ORDER BY t.id LIMIT ?"
+    for mask in range(1 << len(TRIP_FILTERS))
+]
+
+# Coordinates are stored as fixed-point millionths of a degree and
+# categories as IDs into the dim_* lookup tables
+TRIP_DETAIL_QUERY = """
+    SELECT
+        t.id, t.vendor_id, t.pickup_datetime, t.dropoff_datetime,
+        t.passenger_count, t.trip_duration_minutes, t.trip_distance_miles,
+        t.avg_speed_mph, tod.name as time_of_day, sc.name as speed_category,
+        t.pickup_lng_i / 1000000.0 as pickup_longitude,
+        t.pickup_lat_i / 1000000.0 as pickup_latitude,
+        t.dropoff_lng_i / 1000000.0 as dropoff_longitude,
+        t.dropoff_lat_i / 1000000.0 as dropoff_latitude,
+        t.pickup_hour, dn.name as pickup_day_name, t.is_weekend,
+        t.is_rush_hour
+    FROM trips t
+    LEFT JOIN dim_day_name dn ON dn.id = t.pickup_day_name_id
+    LEFT JOIN dim_time_of_day tod ON tod.id = t.time_of_day_id
+    LEFT JOIN dim_speed_category sc ON sc.id = t.speed_category_id
+    WHERE t.id = ?
+"""
+
+STATS_QUERY = "SELECT * FROM stats_overall"
+
+# All four time-pattern breakdowns in one round trip; `key` holds each
+# bucket's grouping value and sort_key reproduces each bucket's ordering
+TIME_PATTERNS_QUERY = """
+    SELECT 'by_time_of_day' as bucket, time_of_day as key, trip_count,
+        avg_speed, avg_duration, NULL as avg_distance, -trip_count as sort_key
+    FROM stats_by_time_of_day
+    UNION ALL
+    SELECT 'by_hour', pickup_hour, trip_count,
+        avg_speed, NULL, NULL, pickup_hour
+    FROM stats_by_hour
+    UNION ALL
+    SELECT 'by_day_of_week', pickup_day_name, trip_count,
+        NULL, NULL, avg_distance, -trip_count
+    FROM stats_by_day
+    UNION ALL
+    SELECT 'rush_hour_comparison', period, trip_count,
+        avg_speed, avg_duration, NULL, rowid
+    FROM stats_rush
+    ORDER BY bucket, sort_key
+"""
+
+SPEED_DISTRIBUTION_QUERY = "SELECT * FROM stats_speed_dist ORDER BY trip_count DESC"
+
+SPEED_BY_TIME_QUERY = """
+    SELECT * FROM stats_speed_by_time
+    ORDER BY time_of_day, trip_count DESC
+"""
+
+PICKUP_HEATMAP_QUERY = """
+    SELECT lat, lng, trip_count
+    FROM heatmap_pickup
+    ORDER BY trip_count DESC
+    LIMIT ?
+"""
+
+DROPOFF_HEATMAP_QUERY = """
+    SELECT lat, lng, trip_count
+    FROM heatmap_dropoff
+    ORDER BY trip_count DESC
+    LIMIT ?
+"""
+
+HEALTH_QUERY = "SELECT COUNT(*) as total_trips FROM trips"
+
+
+def dict_factory(cursor, row):
+    """sqlite3 row_factory that builds each row directly as a dict"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived read-only aiosqlite connections
+
+    Connections are opened on demand up to `size` and then reused, so each
+    one keeps its page cache warm across requests.
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = asyncio.LifoQueue()
+        self._opened = 0
+
+    async def _connect(self):
+        conn = await aiosqlite.connect(
+            f"file:{self.db_path}?mode=ro",
+            uri=True,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.row_factory = dict_factory  # Return rows as dictionaries
+        try:
+            for pragma in CONNECTION_PRAGMAS:
+                await conn.execute(pragma)
+        except BaseException:
+            # Stop the connection's thread if setup fails or is cancelled
+            await conn.close()
+            raise
+        return conn
+
+    async def _checkout(self):
+        if not self._idle.empty():
+            return self._idle.get_nowait()
+
+        if self._opened >= self.size:
+            # Pool is at capacity, wait for a connection to be released
+            return await self._idle.get()
+
+        # No lock needed: nothing awaits between the check and the increment
+        self._opened += 1
+        try:
+            return await self._connect()
+        except BaseException:
+            # Also give the slot back when the request is cancelled (client
+            # disconnect), which raises CancelledError rather than Exception
+            self._opened -= 1
+            raise
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a connection for the duration of an `async with` block"""
+        conn = await self._checkout()
+        try:
+            yield conn
+        finally:
+            self._idle.put_nowait(conn)
+
+    async def close(self):
+        """Close all idle connections"""
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            await conn.close()
+            self._opened -= 1
+
+
+db_pool = ConnectionPool(DB_PATH)
 
 
 # Root endpoint
 @app.get("/")
-def root():
+async def root():
     """API root endpoint"""
     return {
         "message": "NYC Taxi Trip Data API",
@@ -96,10 +294,12 @@ def root():
 
 
 # Get all trips with filters
-@app.get("/api/trips", response_model=List[TripBase])
-def get_trips(
+@app.get("/api/trips", responses={200: {"model": TripPage}})
+async def get_trips(
     limit: int = Query(100, ge=1, le=1000, description="Number of trips to return"),
-    offset: int = Query(0, ge=0, description="Number of trips to skip"),
+    after_id: Optional[str] = Query(
+        None, description="Return trips after this id (next_cursor of the last page)"
+    ),
     time_of_day: Optional[str] = Query(
         None, description="Filter by time of day: morning, afternoon, evening, night"
     ),
@@ -111,278 +311,198 @@ def get_trips(
         None, ge=0, description="Maximum trip distance in miles"
     ),
 ):
-    """Get trips with optional filters"""
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Build query with filters
-    query = """
-        SELECT 
-            t.id, t.vendor_id, t.pickup_datetime, t.dropoff_datetime,
-            t.passenger_count, t.trip_duration_minutes, t.trip_distance_miles,
-            t.avg_speed_mph, tt.time_of_day, tc.speed_category
-        FROM trips t
-        LEFT JOIN trip_temporal tt ON t.id = tt.trip_id
-        LEFT JOIN trip_categories tc ON t.id = tc.trip_id
-        WHERE 1=1
+    """Get trips with optional filters, paginated by trip id
+
+    Pages are keyset-paginated: each one starts with an index seek past
+    `after_id`, so deep pages cost the same as the first.
     """
 
+    # Empty category strings are treated as unset; set filters flip their bit
+    filters = (
+        time_of_day or None,
+        speed_category or None,
+        min_distance,
+        max_distance,
+        after_id,
+    )
+    mask = 0
     params = []
+    for bit, value in enumerate(filters):
+        if value is not None:
+            mask |= 1 << bit
+            params.append(value)
+    params.append(limit)
 
-    if time_of_day:
-        query += " AND tt.time_of_day = ?"
-        params.append(time_of_day)
+    async with db_pool.acquire() as conn:
+        async with conn.execute(TRIPS_QUERIES[mask], params) as cursor:
+            trips = await cursor.fetchall()
 
-    if speed_category:
-        query += " AND tc.speed_category = ?"
-        params.append(speed_category)
+    # A short page is the last one
+    next_cursor = trips[-1]["id"] if len(trips) == limit else None
 
-    if min_distance is not None:
-        query += " AND t.trip_distance_miles >= ?"
-        params.append(min_distance)
+    return {"trips": trips, "next_cursor": next_cursor}
 
-    if max_distance is not None:
-        query += " AND t.trip_distance_miles <= ?"
-        params.append(max_distance)
 
-    query += " LIMIT ? OFFSET ?"
-    params.extend([limit, offset])
+# Get single trip by ID
+@app.get("/api/trips/{trip_id}", responses={200: {"model": TripDetail}})
+async def get_trip_detail(trip_id: str):
+    """Get detailed information for a specific trip"""
 
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
+    async with db_pool.acquire() as conn:
+        async with conn.execute(TRIP_DETAIL_QUERY, (trip_id,)) as cursor:
+            row = await cursor.fetchone()
 
-    return [dict(row) for row in rows]
+    if not row:
+        raise HTTPException(status_code=404, detail="Trip not found")
 
+    return row
 
-# Get single trip by ID
-@app.get("/api/trips/{trip_id}", response_model=TripDetail)
-def get_trip_detail(trip_id: str):
-    """Get detailed information for a specific trip"""
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT 
-            t.*,
-            tt.pickup_hour, tt.pickup_day_name, tt.is_weekend,
-            tt.time_of_day, tt.is_rush_hour,
-            tc.speed_category
-        FROM trips t
-        LEFT JOIN trip_temporal tt ON t.id = tt.trip_id
-        LEFT JOIN trip_categories tc ON t.id = tc.trip_id
-        WHERE t.id = ?
-    """,
-        (trip_id,),
-    )
+# Aggregate endpoints may be cached by clients; revalidation uses the ETag
+CACHE_CONTROL = "public, max-age=300"
 
-    row = cursor.fetchone()
-    conn.close()
 
-    if not row:
-        raise HTTPException(status_code=404, detail="Trip not found")
+def database_version():
+    """Modification times of the database file and its write-ahead log
 
-    return dict(row)
+    Every write made by csv_to_sqlite.py changes one of them, so anything
+    cached for an older version is stale. Two stat calls, cheap per request.
+    """
+    try:
+        wal = os.stat(DB_PATH + "-wal")
+        # Readers create an empty log when they connect; only frames count
+        wal_mtime = wal.st_mtime_ns if wal.st_size else 0
+    except FileNotFoundError:
+        wal_mtime = 0
+    return os.stat(DB_PATH).st_mtime_ns, wal_mtime
+
+
+@lru_cache(maxsize=1)
+def database_etag(version):
+    """ETag for responses that only change when the database is rebuilt"""
+    digest = hashlib.blake2b(str(version).encode(), digest_size=8).hexdigest()
+    return '"%s"' % digest
+
+
+def not_modified(request, response):
+    """Return a 304 if the client's copy is current, else tag `response`"""
+    etag = database_etag(database_version())
+    client_tags = [
+        tag.strip().removeprefix("W/")
+        for tag in request.headers.get("if-none-match", "").split(",")
+    ]
+    # If-None-Match compares weakly: W/"x" matches "x", and * matches any tag
+    if etag in client_tags or "*" in client_tags:
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
+
+
+# Summary query results, keyed by query text, for summary_cache_version
+summary_cache = {}
+summary_cache_version = None
+
+
+async def read_summary(query):
+    """Run a query against the precomputed stats_* tables, cached in memory
+
+    The summary tables only change when csv_to_sqlite.py rebuilds the
+    database, so each result is fetched once per database version and then
+    served from memory.
+    """
+    global summary_cache_version
+    version = database_version()
+    if version != summary_cache_version:
+        # The database was rebuilt since these results were fetched
+        summary_cache.clear()
+        summary_cache_version = version
+
+    if query not in summary_cache:
+        async with db_pool.acquire() as conn:
+            async with conn.execute(query) as cursor:
+                summary_cache[query] = await cursor.fetchall()
+    return summary_cache[query]
 
 
 # Get overall statistics
-@app.get("/api/stats", response_model=StatsResponse)
-def get_statistics():
+@app.get("/api/stats", responses={200: {"model": StatsResponse}})
+async def get_statistics(request: Request, response: Response):
     """Get overall dataset statistics"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT 
-            COUNT(*) as total_trips,
-            AVG(trip_duration_minutes) as avg_duration_minutes,
-            AVG(trip_distance_miles) as avg_distance_miles,
-            AVG(avg_speed_mph) as avg_speed_mph,
-            AVG(passenger_count) as avg_passengers
-        FROM trips
-    """
-    )
+    return (await read_summary(STATS_QUERY))[0]
 
-    row = cursor.fetchone()
-    conn.close()
 
-    return dict(row)
+# Response fields per bucket, grouping key first
+TIME_PATTERN_FIELDS = {
+    "by_time_of_day": ["time_of_day", "trip_count", "avg_speed", "avg_duration"],
+    "by_hour": ["pickup_hour", "trip_count", "avg_speed"],
+    "by_day_of_week": ["pickup_day_name", "trip_count", "avg_distance"],
+    "rush_hour_comparison": ["period", "trip_count", "avg_speed", "avg_duration"],
+}
 
 
 # Get time-based patterns
 @app.get("/api/patterns/time")
-def get_time_patterns():
+async def get_time_patterns(request: Request, response: Response):
     """Get trip patterns by time of day and day of week"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Trips by time of day
-    cursor.execute(
-        """
-        SELECT 
-            time_of_day,
-            COUNT(*) as trip_count,
-            AVG(t.avg_speed_mph) as avg_speed,
-            AVG(t.trip_duration_minutes) as avg_duration
-        FROM trip_temporal tt
-        JOIN trips t ON tt.trip_id = t.id
-        GROUP BY time_of_day
-        ORDER BY trip_count DESC
-    """
-    )
-    time_of_day_data = [dict(row) for row in cursor.fetchall()]
-
-    # Trips by hour
-    cursor.execute(
-        """
-        SELECT 
-            pickup_hour,
-            COUNT(*) as trip_count,
-            AVG(t.avg_speed_mph) as avg_speed
-        FROM trip_temporal tt
-        JOIN trips t ON tt.trip_id = t.id
-        GROUP BY pickup_hour
-        ORDER BY pickup_hour
-    """
-    )
-    hourly_data = [dict(row) for row in cursor.fetchall()]
-
-    # Trips by day of week
-    cursor.execute(
-        """
-        SELECT 
-            pickup_day_name,
-            COUNT(*) as trip_count,
-            AVG(t.trip_distance_miles) as avg_distance
-        FROM trip_temporal tt
-        JOIN trips t ON tt.trip_id = t.id
-        GROUP BY pickup_day_name
-        ORDER BY trip_count DESC
-    """
-    )
-    daily_data = [dict(row) for row in cursor.fetchall()]
-
-    # Rush hour vs non-rush hour
-    cursor.execute(
-        """
-        SELECT 
-            CASE WHEN is_rush_hour = 1 THEN 'Rush Hour' ELSE 'Non-Rush Hour' END as period,
-            COUNT(*) as trip_count,
-            AVG(t.avg_speed_mph) as avg_speed,
-            AVG(t.trip_duration_minutes) as avg_duration
-        FROM trip_temporal tt
-        JOIN trips t ON tt.trip_id = t.id
-        GROUP BY is_rush_hour
-    """
-    )
-    rush_hour_data = [dict(row) for row in cursor.fetchall()]
+    patterns = {bucket: [] for bucket in TIME_PATTERN_FIELDS}
 
-    conn.close()
+    for row in await read_summary(TIME_PATTERNS_QUERY):
+        key_field, *value_fields = TIME_PATTERN_FIELDS[row["bucket"]]
+        record = {key_field: row["key"]}
+        record.update({field: row[field] for field in value_fields})
+        patterns[row["bucket"]].append(record)
 
-    return {
-        "by_time_of_day": time_of_day_data,
-        "by_hour": hourly_data,
-        "by_day_of_week": daily_data,
-        "rush_hour_comparison": rush_hour_data,
-    }
+    return patterns
 
 
 # Get speed distribution patterns
 @app.get("/api/patterns/speed")
-def get_speed_patterns():
+async def get_speed_patterns(request: Request, response: Response):
     """Get speed distribution and patterns"""
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Speed category distribution
-    cursor.execute(
-        """
-        SELECT 
-            speed_category,
-            COUNT(*) as trip_count,
-            AVG(t.trip_distance_miles) as avg_distance,
-            AVG(t.trip_duration_minutes) as avg_duration
-        FROM trip_categories tc
-        JOIN trips t ON tc.trip_id = t.id
-        GROUP BY speed_category
-        ORDER BY trip_count DESC
-    """
-    )
-    speed_distribution = [dict(row) for row in cursor.fetchall()]
-
-    # Speed by time of day
-    cursor.execute(
-        """
-        SELECT 
-            tt.time_of_day,
-            tc.speed_category,
-            COUNT(*) as trip_count
-        FROM trip_temporal tt
-        JOIN trip_categories tc ON tt.trip_id = tc.trip_id
-        GROUP BY tt.time_of_day, tc.speed_category
-        ORDER BY tt.time_of_day, trip_count DESC
-    """
-    )
-    speed_by_time = [dict(row) for row in cursor.fetchall()]
-
-    conn.close()
+    cached = not_modified(request, response)
+    if cached:
+        return cached
 
     return {
-        "speed_distribution": speed_distribution,
-        "speed_by_time_of_day": speed_by_time,
+        "speed_distribution": await read_summary(SPEED_DISTRIBUTION_QUERY),
+        "speed_by_time_of_day": await read_summary(SPEED_BY_TIME_QUERY),
     }
 
 
 # Get location patterns for heatmap
 @app.get("/api/patterns/locations")
-def get_location_patterns(
-    limit: int = Query(1000, ge=100, le=10000, description="Number of points to return")
+async def get_location_patterns(
+    request: Request,
+    response: Response,
+    limit: int = Query(
+        1000, ge=100, le=10000, description="Number of points to return"
+    ),
 ):
     """Get pickup/dropoff location data for heatmap visualization"""
+    cached = not_modified(request, response)
+    if cached:
+        return cached
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Sample pickup locations
-    cursor.execute(
-        """
-        SELECT 
-            pickup_latitude as lat,
-            pickup_longitude as lng,
-            COUNT(*) as trip_count
-        FROM trips
-        GROUP BY pickup_latitude, pickup_longitude
-        ORDER BY trip_count DESC
-        LIMIT ?
-    """,
-        (limit,),
-    )
-    pickup_locations = [dict(row) for row in cursor.fetchall()]
-
-    # Sample dropoff locations
-    cursor.execute(
-        """
-        SELECT 
-            dropoff_latitude as lat,
-            dropoff_longitude as lng,
-            COUNT(*) as trip_count
-        FROM trips
-        GROUP BY dropoff_latitude, dropoff_longitude
-        ORDER BY trip_count DESC
-        LIMIT ?
-    """,
-        (limit,),
-    )
-    dropoff_locations = [dict(row) for row in cursor.fetchall()]
+    async with db_pool.acquire() as conn:
+        # Top pickup locations
+        async with conn.execute(PICKUP_HEATMAP_QUERY, (limit,)) as cursor:
+            pickup_locations = await cursor.fetchall()
 
-    conn.close()
+        # Top dropoff locations
+        async with conn.execute(DROPOFF_HEATMAP_QUERY, (limit,)) as cursor:
+            dropoff_locations = await cursor.fetchall()
 
     return {
         "pickup_locations": pickup_locations,
@@ -392,14 +512,12 @@ def get_location_patterns(
 
 # Health check endpoint
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM trips")
-        count = cursor.fetchone()[0]
-        conn.close()
+        async with db_pool.acquire() as conn:
+            async with conn.execute(HEALTH_QUERY) as cursor:
+                count = (await cursor.fetchone())["total_trips"]
 
         return {"status": "healthy", "database": "connected", "total_trips": count}
     except Exception as e:
@@ -1,11 +1,30 @@
 import os
 import sqlite3
 
-import pandas as pd
-
-
-def create_database_schema(db_path):
-    """Create the database schema with proper indexes"""
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Categorical columns stored on trips as small integer IDs into a lookup
+# table; names are listed in data_cleaning.py's category code order
+DIMENSIONS = {
+    "time_of_day": (
+        "dim_time_of_day",
+        ["night", "morning", "afternoon", "evening"],
+    ),
+    "speed_category": (
+        "dim_speed_category",
+        ["very_slow", "slow", "moderate", "fast", "very_fast"],
+    ),
+    "pickup_day_name": (
+        "dim_day_name",
+        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+    ),
+}
+
+
+def create_tables(db_path):
+    """Create the database tables (indexes are built after the load)"""
     print("=" * 60)
     print("CREATING DATABASE SCHEMA")
     print("=" * 60)
@@ -13,12 +32,27 @@ def create_database_schema(db_path):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Drop existing tables if they exist
+    # WAL is persistent in the file, so the API's read-only pool inherits it
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    # Drop existing tables if they exist (trip_temporal and trip_categories
+    # are from the old three-table layout)
     cursor.execute("DROP TABLE IF EXISTS trip_categories")
     cursor.execute("DROP TABLE IF EXISTS trip_temporal")
     cursor.execute("DROP TABLE IF EXISTS trips")
+    for table, _ in DIMENSIONS.values():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    # Lookup tables for the categorical ID columns on trips
+    for table, names in DIMENSIONS.values():
+        cursor.execute(
+            f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+        )
+        cursor.executemany(f"INSERT INTO {table} VALUES (?, ?)", enumerate(names))
+        print(f"✓ Created table: {table}")
 
-    # Table 1: Main trips table
+    # One wide table: the temporal and category features are 1:1 with a
+    # trip, so keeping them inline saves a join per row on every query
     cursor.execute(
         """
         CREATE TABLE trips (
@@ -27,208 +61,343 @@ def create_database_schema(db_path):
             pickup_datetime DATETIME NOT NULL,
             dropoff_datetime DATETIME NOT NULL,
             passenger_count INTEGER NOT NULL,
-            pickup_longitude REAL NOT NULL,
-            pickup_latitude REAL NOT NULL,
-            dropoff_longitude REAL NOT NULL,
-            dropoff_latitude REAL NOT NULL,
-            store_and_fwd_flag TEXT,
+            -- Coordinates as fixed-point integers in millionths of a degree
+            pickup_lng_i INTEGER NOT NULL,
+            pickup_lat_i INTEGER NOT NULL,
+            dropoff_lng_i INTEGER NOT NULL,
+            dropoff_lat_i INTEGER NOT NULL,
             trip_duration INTEGER NOT NULL,
             trip_duration_minutes REAL NOT NULL,
             trip_distance_miles REAL NOT NULL,
-            avg_speed_mph REAL NOT NULL
-        )
-    """
-    )
-    print("✓ Created table: trips")
-
-    # Table 2: Temporal features
-    cursor.execute(
-        """
-        CREATE TABLE trip_temporal (
-            trip_id TEXT PRIMARY KEY,
+            avg_speed_mph REAL NOT NULL,
             pickup_hour INTEGER NOT NULL,
             pickup_day_of_week INTEGER NOT NULL,
-            pickup_day_name TEXT NOT NULL,
+            pickup_day_name_id INTEGER NOT NULL REFERENCES dim_day_name(id),
             pickup_month INTEGER NOT NULL,
             is_weekend INTEGER NOT NULL,
-            time_of_day TEXT NOT NULL,
+            time_of_day_id INTEGER NOT NULL REFERENCES dim_time_of_day(id),
             is_rush_hour INTEGER NOT NULL,
-            FOREIGN KEY (trip_id) REFERENCES trips(id) ON DELETE CASCADE
+            speed_category_id INTEGER NOT NULL REFERENCES dim_speed_category(id)
         )
     """
     )
-    print("✓ Created table: trip_temporal")
+    print("✓ Created table: trips")
 
-    # Table 3: Categories
-    cursor.execute(
-        """
-        CREATE TABLE trip_categories (
-            trip_id TEXT PRIMARY KEY,
-            speed_category TEXT NOT NULL,
-            FOREIGN KEY (trip_id) REFERENCES trips(id) ON DELETE CASCADE
-        )
+    conn.commit()
+    conn.close()
+
+    print(f"\n✓ Database schema created successfully at: {db_path}")
+
+
+def create_indexes(db_path):
+    """Create indexes on the loaded tables and refresh planner statistics
+
+    Building each index once over the loaded rows is far cheaper than
+    maintaining it through every insert.
     """
-    )
-    print("✓ Created table: trip_categories")
+    print("\n" + "=" * 60)
+    print("CREATING INDEXES")
+    print("=" * 60)
 
-    # Create indexes for fast queries
-    print("\nCreating indexes...")
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
 
     # Indexes on trips table
     cursor.execute("CREATE INDEX idx_trips_pickup_datetime ON trips(pickup_datetime)")
     cursor.execute("CREATE INDEX idx_trips_vendor_id ON trips(vendor_id)")
     cursor.execute("CREATE INDEX idx_trips_passenger_count ON trips(passenger_count)")
     cursor.execute(
-        "CREATE INDEX idx_trips_pickup_coords ON trips(pickup_latitude, pickup_longitude)"
+        "CREATE INDEX idx_trips_pickup_coords ON trips(pickup_lat_i, pickup_lng_i)"
     )
     cursor.execute(
-        "CREATE INDEX idx_trips_dropoff_coords ON trips(dropoff_latitude, dropoff_longitude)"
+        "CREATE INDEX idx_trips_dropoff_coords ON trips(dropoff_lat_i, dropoff_lng_i)"
     )
     cursor.execute("CREATE INDEX idx_trips_duration ON trips(trip_duration)")
     cursor.execute("CREATE INDEX idx_trips_distance ON trips(trip_distance_miles)")
     cursor.execute("CREATE INDEX idx_trips_speed ON trips(avg_speed_mph)")
-    print("✓ Created 8 indexes on trips table")
 
-    # Indexes on trip_temporal table
+    # Covering indexes: each aggregate in SUMMARY_TABLES is an index-only scan
     cursor.execute(
-        "CREATE INDEX idx_temporal_pickup_hour ON trip_temporal(pickup_hour)"
+        "CREATE INDEX idx_trips_tod_speed ON trips(time_of_day_id, speed_category_id, avg_speed_mph, trip_duration_minutes)"
     )
     cursor.execute(
-        "CREATE INDEX idx_temporal_day_of_week ON trip_temporal(pickup_day_of_week)"
+        "CREATE INDEX idx_trips_hour_speed ON trips(pickup_hour, avg_speed_mph)"
     )
-    cursor.execute("CREATE INDEX idx_temporal_month ON trip_temporal(pickup_month)")
-    cursor.execute("CREATE INDEX idx_temporal_is_weekend ON trip_temporal(is_weekend)")
     cursor.execute(
-        "CREATE INDEX idx_temporal_time_of_day ON trip_temporal(time_of_day)"
+        "CREATE INDEX idx_trips_day_dist ON trips(pickup_day_name_id, trip_distance_miles)"
     )
     cursor.execute(
-        "CREATE INDEX idx_temporal_is_rush_hour ON trip_temporal(is_rush_hour)"
+        "CREATE INDEX idx_trips_rush ON trips(is_rush_hour, avg_speed_mph, trip_duration_minutes)"
     )
-    print("✓ Created 6 indexes on trip_temporal table")
-
-    # Index on trip_categories table
     cursor.execute(
-        "CREATE INDEX idx_categories_speed_category ON trip_categories(speed_category)"
+        "CREATE INDEX idx_trips_speedcat ON trips(speed_category_id, trip_distance_miles, trip_duration_minutes)"
     )
-    print("✓ Created 1 index on trip_categories table")
+
+    # Temporal filters without a covering index above
+    cursor.execute("CREATE INDEX idx_trips_day_of_week ON trips(pickup_day_of_week)")
+    cursor.execute("CREATE INDEX idx_trips_month ON trips(pickup_month)")
+    cursor.execute("CREATE INDEX idx_trips_is_weekend ON trips(is_weekend)")
+    print("✓ Created 16 indexes on trips table")
+
+    # Refresh planner statistics so the covering indexes get picked
+    cursor.execute("ANALYZE")
 
     conn.commit()
     conn.close()
 
-    print(f"\n✓ Database schema created successfully at: {db_path}")
-    print(f"✓ Total indexes created: 15")
+    print(f"\n✓ Total indexes created: 16")
+
+
+# Cleaned-data columns inserted into trips, in table column order
+TRIPS_COLUMNS = [
+    "id",
+    "vendor_id",
+    "pickup_datetime",
+    "dropoff_datetime",
+    "passenger_count",
+    "pickup_lng_i",
+    "pickup_lat_i",
+    "dropoff_lng_i",
+    "dropoff_lat_i",
+    "trip_duration",
+    "trip_duration_minutes",
+    "trip_distance_miles",
+    "avg_speed_mph",
+    "pickup_hour",
+    "pickup_day_of_week",
+    "pickup_day_name_id",
+    "pickup_month",
+    "is_weekend",
+    "time_of_day_id",
+    "is_rush_hour",
+    "speed_category_id",
+]
+
+
+# Fixed-point scale for stored coordinates: 1e-6 degrees is about 0.1 m
+COORD_SCALE = 1_000_000
+
+# Stored integer coordinate column for each cleaned-data coordinate
+COORD_COLUMNS = {
+    "pickup_longitude": "pickup_lng_i",
+    "pickup_latitude": "pickup_lat_i",
+    "dropoff_longitude": "dropoff_lng_i",
+    "dropoff_latitude": "dropoff_lat_i",
+}
+
+
+def prepare_batch(batch):
+    """Convert a cleaned-data batch to the representation stored in SQLite
+
+    Datetimes become the same text SQLite has always held for them,
+    coordinates become int32 fixed-point so each one takes 4 bytes on disk
+    instead of an 8-byte REAL, and categorical names become lookup IDs.
+    """
+    for column in ["pickup_datetime", "dropoff_datetime"]:
+        text = pc.strftime(
+            batch[column].cast(pa.timestamp("s")), format="%Y-%m-%d %H:%M:%S"
+        )
+        batch = batch.set_column(batch.schema.get_field_index(column), column, text)
+
+    for column, fixed_column in COORD_COLUMNS.items():
+        scaled = pc.round(pc.multiply(batch[column].cast(pa.float64()), COORD_SCALE))
+        batch = batch.append_column(fixed_column, scaled.cast(pa.int32()))
+
+    # Unknown names map to null and are rejected by the NOT NULL constraint
+    for column, (_, names) in DIMENSIONS.items():
+        ids = pc.index_in(batch[column], value_set=pa.array(names))
+        batch = batch.append_column(f"{column}_id", ids.cast(pa.int8()))
+    return batch
 
 
-def load_data_to_database(csv_path, db_path, batch_size=10000):
-    """Load cleaned CSV data into SQLite database"""
+def load_data_to_database(data_path, db_path, batch_size=100_000):
+    """Stream cleaned Parquet data into SQLite one record batch at a time"""
     print("\n" + "=" * 60)
     print("LOADING DATA INTO DATABASE")
     print("=" * 60)
 
-    # Read the cleaned CSV
-    print(f"\nReading CSV: {csv_path}")
-    df = pd.read_csv(csv_path)
-    print(f"✓ Loaded {len(df):,} rows")
+    print(f"\nReading Parquet: {data_path}")
+    parquet_file = pq.ParquetFile(data_path)
+    total_rows = parquet_file.metadata.num_rows
+    print(f"✓ Found {total_rows:,} rows")
 
-    # Connect to database
+    # Connect to database with bulk-load settings: no rollback journal or
+    # fsync while loading, since a failed load is simply rerun from scratch
     conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor = conn.cursor()
+
+    insert_sql = f"INSERT INTO trips VALUES ({', '.join('?' * len(TRIPS_COLUMNS))})"
 
-    # Prepare data for trips table
-    print("\nPreparing data for 'trips' table...")
-    trips_df = df[
-        [
-            "id",
-            "vendor_id",
-            "pickup_datetime",
-            "dropoff_datetime",
-            "passenger_count",
-            "pickup_longitude",
-            "pickup_latitude",
-            "dropoff_longitude",
-            "dropoff_latitude",
-            "store_and_fwd_flag",
-            "trip_duration",
-            "trip_duration_minutes",
-            "trip_distance_miles",
-            "avg_speed_mph",
-        ]
-    ].copy()
-
-    # Prepare data for trip_temporal table
-    print("Preparing data for 'trip_temporal' table...")
-    temporal_df = df[
-        [
-            "id",
-            "pickup_hour",
-            "pickup_day_of_week",
-            "pickup_day_name",
-            "pickup_month",
-            "is_weekend",
-            "time_of_day",
-            "is_rush_hour",
-        ]
-    ].copy()
-    temporal_df.columns = [
-        "trip_id",
-        "pickup_hour",
-        "pickup_day_of_week",
-        "pickup_day_name",
-        "pickup_month",
-        "is_weekend",
-        "time_of_day",
-        "is_rush_hour",
-    ]
-
-    # Prepare data for trip_categories table
-    print("Preparing data for 'trip_categories' table...")
-    categories_df = df[["id", "speed_category"]].copy()
-    categories_df.columns = ["trip_id", "speed_category"]
-
-    # Insert data in batches
+    # All batches go in inside a single transaction
     print(f"\nInserting data in batches of {batch_size:,}...")
+    cursor.execute("BEGIN IMMEDIATE")
 
-    total_rows = len(df)
+    progress = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        batch = prepare_batch(batch)
+        values = [batch[column].to_pylist() for column in TRIPS_COLUMNS]
+        cursor.executemany(insert_sql, zip(*values))
 
-    # Insert trips
-    print("\nInserting into 'trips' table...")
-    for i in range(0, len(trips_df), batch_size):
-        batch = trips_df.iloc[i : i + batch_size]
-        batch.to_sql("trips", conn, if_exists="append", index=False)
-        progress = min(i + batch_size, total_rows)
-        print(
-            f"  Progress: {progress:,}/{total_rows:,} ({100*progress/total_rows:.1f}%)",
-            end="\r",
-        )
-    print(f"\n✓ Inserted {len(trips_df):,} rows into 'trips' table")
-
-    # Insert temporal
-    print("\nInserting into 'trip_temporal' table...")
-    for i in range(0, len(temporal_df), batch_size):
-        batch = temporal_df.iloc[i : i + batch_size]
-        batch.to_sql("trip_temporal", conn, if_exists="append", index=False)
-        progress = min(i + batch_size, total_rows)
+        progress += batch.num_rows
         print(
             f"  Progress: {progress:,}/{total_rows:,} ({100*progress/total_rows:.1f}%)",
             end="\r",
         )
-    print(f"\n✓ Inserted {len(temporal_df):,} rows into 'trip_temporal' table")
-
-    # Insert categories
-    print("\nInserting into 'trip_categories' table...")
-    for i in range(0, len(categories_df), batch_size):
-        batch = categories_df.iloc[i : i + batch_size]
-        batch.to_sql("trip_categories", conn, if_exists="append", index=False)
-        progress = min(i + batch_size, total_rows)
-        print(
-            f"  Progress: {progress:,}/{total_rows:,} ({100*progress/total_rows:.1f}%)",
-            end="\r",
-        )
-    print(f"\n✓ Inserted {len(categories_df):,} rows into 'trip_categories' table")
 
+    conn.commit()
+    print(f"\n✓ Inserted {progress:,} rows into 'trips' table")
+
+    # Back to WAL for the API's concurrent readers
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.close()
     print("\n✓ Data loading complete!")
 
 
+# Aggregations served by the API, materialized once per ingest
+SUMMARY_TABLES = {
+    "stats_overall": """
+        SELECT
+            COUNT(*) as total_trips,
+            AVG(trip_duration_minutes) as avg_duration_minutes,
+            AVG(trip_distance_miles) as avg_distance_miles,
+            AVG(avg_speed_mph) as avg_speed_mph,
+            AVG(passenger_count) as avg_passengers
+        FROM trips
+    """,
+    # Grouped on the integer IDs; names are joined in on the few result rows
+    "stats_by_time_of_day": """
+        SELECT
+            d.name as time_of_day,
+            s.trip_count,
+            s.avg_speed,
+            s.avg_duration
+        FROM (
+            SELECT
+                time_of_day_id,
+                COUNT(*) as trip_count,
+                AVG(avg_speed_mph) as avg_speed,
+                AVG(trip_duration_minutes) as avg_duration
+            FROM trips
+            GROUP BY time_of_day_id
+        ) s
+        JOIN dim_time_of_day d ON d.id = s.time_of_day_id
+    """,
+    "stats_by_hour": """
+        SELECT
+            pickup_hour,
+            COUNT(*) as trip_count,
+            AVG(avg_speed_mph) as avg_speed
+        FROM trips
+        GROUP BY pickup_hour
+    """,
+    "stats_by_day": """
+        SELECT
+            d.name as pickup_day_name,
+            s.trip_count,
+            s.avg_distance
+        FROM (
+            SELECT
+                pickup_day_name_id,
+                COUNT(*) as trip_count,
+                AVG(trip_distance_miles) as avg_distance
+            FROM trips
+            GROUP BY pickup_day_name_id
+        ) s
+        JOIN dim_day_name d ON d.id = s.pickup_day_name_id
+    """,
+    "stats_rush": """
+        SELECT
+            CASE WHEN is_rush_hour = 1 THEN 'Rush Hour' ELSE 'Non-Rush Hour' END as period,
+            COUNT(*) as trip_count,
+            AVG(avg_speed_mph) as avg_speed,
+            AVG(trip_duration_minutes) as avg_duration
+        FROM trips
+        GROUP BY is_rush_hour
+    """,
+    "stats_speed_dist": """
+        SELECT
+            d.name as speed_category,
+            s.trip_count,
+            s.avg_distance,
+            s.avg_duration
+        FROM (
+            SELECT
+                speed_category_id,
+                COUNT(*) as trip_count,
+                AVG(trip_distance_miles) as avg_distance,
+                AVG(trip_duration_minutes) as avg_duration
+            FROM trips
+            GROUP BY speed_category_id
+        ) s
+        JOIN dim_speed_category d ON d.id = s.speed_category_id
+    """,
+    "stats_speed_by_time": """
+        SELECT
+            tod.name as time_of_day,
+            sc.name as speed_category,
+            s.trip_count
+        FROM (
+            SELECT
+                time_of_day_id,
+                speed_category_id,
+                COUNT(*) as trip_count
+            FROM trips
+            GROUP BY time_of_day_id, speed_category_id
+        ) s
+        JOIN dim_time_of_day tod ON tod.id = s.time_of_day_id
+        JOIN dim_speed_category sc ON sc.id = s.speed_category_id
+    """,
+    # Coordinates binned to 4 decimal places (~11 m) for the heatmap, rounded
+    # to nearest like ROUND(x, 4) on the original float coordinates
+    "heatmap_pickup": """
+        SELECT
+            ROUND(pickup_lat_i / 100.0) / 10000.0 as lat,
+            ROUND(pickup_lng_i / 100.0) / 10000.0 as lng,
+            COUNT(*) as trip_count
+        FROM trips
+        GROUP BY 1, 2
+    """,
+    "heatmap_dropoff": """
+        SELECT
+            ROUND(dropoff_lat_i / 100.0) / 10000.0 as lat,
+            ROUND(dropoff_lng_i / 100.0) / 10000.0 as lng,
+            COUNT(*) as trip_count
+        FROM trips
+        GROUP BY 1, 2
+    """,
+}
+
+
+def build_summary_tables(db_path):
+    """Precompute the API's aggregate queries into small stats_* tables"""
+    print("\n" + "=" * 60)
+    print("BUILDING SUMMARY TABLES")
+    print("=" * 60)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    for table, query in SUMMARY_TABLES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"CREATE TABLE {table} AS {query}")
+        print(f"✓ Created table: {table}")
+
+    # Heatmap endpoints read the top-N bins by count
+    cursor.execute(
+        "CREATE INDEX idx_heatmap_pickup_count ON heatmap_pickup(trip_count DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX idx_heatmap_dropoff_count ON heatmap_dropoff(trip_count DESC)"
+    )
+    print("✓ Created 2 indexes on heatmap tables")
+
+    conn.commit()
+    conn.close()
+
+
 def verify_database(db_path):
     """Verify the database was created correctly"""
     print("\n" + "=" * 60)
@@ -267,11 +436,11 @@ def verify_database(db_path):
             t.trip_duration_minutes,
             t.trip_distance_miles,
             t.avg_speed_mph,
-            tt.time_of_day,
-            tc.speed_category
+            tod.name,
+            sc.name
         FROM trips t
-        JOIN trip_temporal tt ON t.id = tt.trip_id
-        JOIN trip_categories tc ON t.id = tc.trip_id
+        LEFT JOIN dim_time_of_day tod ON tod.id = t.time_of_day_id
+        LEFT JOIN dim_speed_category sc ON sc.id = t.speed_category_id
         LIMIT 5
     """
     )
@@ -297,22 +466,28 @@ def main():
     print("=" * 60)
 
     # Configuration
-    csv_path = "../../data/cleaned/cleaned_taxi_data.csv"
+    data_path = "../../data/cleaned/cleaned_taxi_data.parquet"
     db_path = "../script/taxi_data.db"
 
-    # Check if CSV exists
-    if not os.path.exists(csv_path):
-        print(f"\n❌ Error: CSV file not found at {csv_path}")
+    # Check if the cleaned data exists
+    if not os.path.exists(data_path):
+        print(f"\n❌ Error: Cleaned data file not found at {data_path}")
         print("Please run the data cleaning script first.")
         return
 
-    # Step 1: Create database schema
-    create_database_schema(db_path)
+    # Step 1: Create database tables
+    create_tables(db_path)
 
     # Step 2: Load data
-    load_data_to_database(csv_path, db_path)
+    load_data_to_database(data_path, db_path)
+
+    # Step 3: Index the loaded data
+    create_indexes(db_path)
+
+    # Step 4: Precompute aggregates for the API
+    build_summary_tables(db_path)
 
-    # Step 3: Verify
+    # Step 5: Verify
     verify_database(db_path)
 
     print("\n" + "=" * 60)
@@ -321,5 +496,5 @@ def main():
     print(f"\n✓ Database created: {db_path}")
     
 
-if __name__ == "_main_":
+if __name__ == "__main__":
     main()
\ No newline at end of file
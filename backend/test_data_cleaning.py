@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaning import (
+    EARTH_RADIUS_MILES,
+    MAX_SPEED_MPH,
+    RUSH_HOUR_BY_HOUR,
+    SPEED_EDGES,
+    TIME_OF_DAY_BY_HOUR,
+    check_data_quality,
+    count_value_ranges,
+    featurize,
+    trip_metrics,
+)
+
+SAMPLE_SIZE = 1000
+
+
+def random_trips(rng, n=SAMPLE_SIZE):
+    """Random trips inside the NYC bounding box used by remove_invalid_values"""
+    return pd.DataFrame(
+        {
+            "pickup_latitude": rng.uniform(40.5, 41.0, n).astype(np.float32),
+            "pickup_longitude": rng.uniform(-74.3, -73.7, n).astype(np.float32),
+            "dropoff_latitude": rng.uniform(40.5, 41.0, n).astype(np.float32),
+            "dropoff_longitude": rng.uniform(-74.3, -73.7, n).astype(np.float32),
+            "trip_duration": rng.integers(0, 7200, n).astype(np.int32),
+        }
+    )
+
+
+def numpy_haversine(lat1, lon1, lat2, lon2):
+    """Reference Haversine distance in miles, written with plain NumPy"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(x.astype(np.float64)) for x in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+def raw_trips(rng, n=SAMPLE_SIZE):
+    """Random raw trips typed like read_taxi_csv output, some outside NYC"""
+    return pd.DataFrame(
+        {
+            "vendor_id": pd.array(rng.integers(1, 3, n), dtype="Int8"),
+            "store_and_fwd_flag": pd.Categorical(rng.choice(["N", "Y"], n)),
+            "pickup_latitude": rng.uniform(40.3, 41.2, n).astype(np.float32),
+            "pickup_longitude": rng.uniform(-74.5, -73.5, n).astype(np.float32),
+            "dropoff_latitude": rng.uniform(40.3, 41.2, n).astype(np.float32),
+            "dropoff_longitude": rng.uniform(-74.5, -73.5, n).astype(np.float32),
+            "trip_duration": pd.array(rng.integers(-100, 100_000, n), dtype="Int32"),
+            "passenger_count": pd.array(rng.integers(0, 9, n), dtype="Int8"),
+        }
+    )
+
+
+def test_trip_metrics_matches_numpy():
+    df = random_trips(np.random.default_rng(0))
+
+    distance, speed, keep = trip_metrics(df)
+
+    expected_distance = numpy_haversine(
+        df["pickup_latitude"].to_numpy(),
+        df["pickup_longitude"].to_numpy(),
+        df["dropoff_latitude"].to_numpy(),
+        df["dropoff_longitude"].to_numpy(),
+    )
+    np.testing.assert_allclose(distance, expected_distance, rtol=1e-5, atol=1e-6)
+
+    duration = df["trip_duration"].to_numpy()
+    expected_speed = np.zeros(len(df))
+    moving = duration > 0
+    expected_speed[moving] = distance[moving] * 3600.0 / duration[moving]
+    np.testing.assert_allclose(speed, expected_speed, rtol=1e-6)
+    np.testing.assert_array_equal(keep, speed <= MAX_SPEED_MPH)
+
+
+def test_featurize_matches_pandas_dt():
+    rng = np.random.default_rng(1)
+    # Seconds from 1900 to 2100, so pre-epoch dates and leap centuries are covered
+    seconds = rng.integers(-2_208_988_800, 4_102_444_800, SAMPLE_SIZE)
+    pickup = pd.Series(pd.to_datetime(seconds, unit="s"))
+    speed = rng.uniform(0, MAX_SPEED_MPH, SAMPLE_SIZE)
+
+    features = featurize(pickup, speed)
+
+    hour = pickup.dt.hour.to_numpy()
+    day_of_week = pickup.dt.dayofweek.to_numpy()
+    np.testing.assert_array_equal(features["pickup_hour"], hour)
+    np.testing.assert_array_equal(features["pickup_day_of_week"], day_of_week)
+    np.testing.assert_array_equal(features["pickup_month"], pickup.dt.month)
+    np.testing.assert_array_equal(features["is_weekend"], day_of_week >= 5)
+    np.testing.assert_array_equal(features["time_of_day"], TIME_OF_DAY_BY_HOUR[hour])
+    np.testing.assert_array_equal(features["is_rush_hour"], RUSH_HOUR_BY_HOUR[hour])
+    np.testing.assert_array_equal(
+        features["speed_category"],
+        np.searchsorted(SPEED_EDGES, speed, side="right"),
+    )
+
+
+def test_count_value_ranges_skips_missing_values_per_column():
+    df = raw_trips(np.random.default_rng(2))
+    df.loc[3, "pickup_latitude"] = np.nan
+    df.loc[5, "dropoff_longitude"] = np.nan
+    df.loc[7, "passenger_count"] = pd.NA
+
+    # Small chunks so the shorter, NaN-free arrays run out before the last one
+    counts = count_value_ranges(df, chunk_rows=128)
+
+    duration = df["trip_duration"]
+    assert counts.duration_min == duration.min()
+    assert counts.duration_max == duration.max()
+    np.testing.assert_allclose(
+        counts.duration_sum / counts.duration_count, duration.mean()
+    )
+    assert counts.negative_durations == (duration < 0).sum()
+    assert counts.short_trips == (duration < 60).sum()
+    assert counts.extremely_long_trips == (duration > 86400).sum()
+
+    passengers = df["passenger_count"]
+    assert counts.passenger_min == passengers.min()
+    assert counts.passenger_max == passengers.max()
+    assert counts.zero_passengers == (passengers == 0).sum()
+    assert counts.suspicious_passengers == (passengers > 6).sum()
+
+    for prefix in ["pickup", "dropoff"]:
+        lat = df[f"{prefix}_latitude"]
+        lon = df[f"{prefix}_longitude"]
+        assert getattr(counts, f"{prefix}_lat_min") == lat.min()
+        assert getattr(counts, f"{prefix}_lat_max") == lat.max()
+        assert getattr(counts, f"{prefix}_lon_min") == lon.min()
+        assert getattr(counts, f"{prefix}_lon_max") == lon.max()
+        assert (
+            getattr(counts, f"{prefix}_lat_outside")
+            == ((lat < 40.5) | (lat > 41.0)).sum()
+        )
+        assert (
+            getattr(counts, f"{prefix}_lon_outside")
+            == ((lon < -74.3) | (lon > -73.7)).sum()
+        )
+
+
+def test_check_data_quality_reports_nan_without_durations(capsys):
+    rng = np.random.default_rng(3)
+    no_durations = raw_trips(rng)
+    no_durations["trip_duration"] = pd.NA
+
+    for df in [raw_trips(rng, n=0), no_durations]:
+        check_data_quality(df)
+
+        counts = count_value_ranges(df)
+        assert counts.duration_count == 0
+        assert np.isnan(counts.duration_min) and np.isnan(counts.duration_max)
+        assert "Mean: nan seconds" in capsys.readouterr().out
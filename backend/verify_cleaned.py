@@ -1,7 +1,7 @@
 import pandas as pd
 
 # Load cleaned data
-df = pd.read_csv("../data/cleaned/cleaned_taxi_data.csv")
+df = pd.read_parquet("../data/cleaned/cleaned_taxi_data.parquet")
 
 print("=" * 60)
 print("CLEANED DATA VERIFICATION")
@@ -29,32 +29,41 @@ if missing.sum() == 0:
 else:
     print(missing[missing > 0])
 
+# Min/max for every range check in a single pass
+ranges = df[
+    [
+        "passenger_count",
+        "trip_duration",
+        "trip_distance_miles",
+        "avg_speed_mph",
+        "pickup_latitude",
+        "pickup_longitude",
+        "dropoff_latitude",
+        "dropoff_longitude",
+    ]
+].agg(["min", "max"])
+# to_dict keeps each column's own dtype (a .loc row would upcast ints)
+ranges = ranges.to_dict("index")
+lo, hi = ranges["min"], ranges["max"]
+
 print("\n2. Value Ranges:")
+print(f"   Passenger count: {lo['passenger_count']} to {hi['passenger_count']}")
+print(f"   Trip duration: {lo['trip_duration']} to {hi['trip_duration']} seconds")
 print(
-    f"   Passenger count: {df['passenger_count'].min()} to {df['passenger_count'].max()}"
-)
-print(
-    f"   Trip duration: {df['trip_duration'].min()} to {df['trip_duration'].max()} seconds"
-)
-print(
-    f"   Trip distance: {df['trip_distance_miles'].min():.2f} to {df['trip_distance_miles'].max():.2f} miles"
-)
-print(
-    f"   Average speed: {df['avg_speed_mph'].min():.2f} to {df['avg_speed_mph'].max():.2f} mph"
+    f"   Trip distance: {lo['trip_distance_miles']:.2f} to {hi['trip_distance_miles']:.2f} miles"
 )
+print(f"   Average speed: {lo['avg_speed_mph']:.2f} to {hi['avg_speed_mph']:.2f} mph")
 
 print("\n3. Coordinate Bounds:")
+print(f"   Pickup latitude: {lo['pickup_latitude']:.6f} to {hi['pickup_latitude']:.6f}")
 print(
-    f"   Pickup latitude: {df['pickup_latitude'].min():.6f} to {df['pickup_latitude'].max():.6f}"
-)
-print(
-    f"   Pickup longitude: {df['pickup_longitude'].min():.6f} to {df['pickup_longitude'].max():.6f}"
+    f"   Pickup longitude: {lo['pickup_longitude']:.6f} to {hi['pickup_longitude']:.6f}"
 )
 print(
-    f"   Dropoff latitude: {df['dropoff_latitude'].min():.6f} to {df['dropoff_latitude'].max():.6f}"
+    f"   Dropoff latitude: {lo['dropoff_latitude']:.6f} to {hi['dropoff_latitude']:.6f}"
 )
 print(
-    f"   Dropoff longitude: {df['dropoff_longitude'].min():.6f} to {df['dropoff_longitude'].max():.6f}"
+    f"   Dropoff longitude: {lo['dropoff_longitude']:.6f} to {hi['dropoff_longitude']:.6f}"
 )
 
 print("\n4. Summary Statistics:")
@@ -71,14 +80,14 @@ print(
 )
 
 print("\n5. Categorical Features:")
-print(f"\n   Time of Day Distribution:")
-print(df["time_of_day"].value_counts())
-
-print(f"\n   Day of Week Distribution:")
-print(df["pickup_day_name"].value_counts())
-
-print(f"\n   Speed Category Distribution:")
-print(df["speed_category"].value_counts())
+categorical = {
+    "time_of_day": "Time of Day",
+    "pickup_day_name": "Day of Week",
+    "speed_category": "Speed Category",
+}
+for col, label in categorical.items():
+    print(f"\n   {label} Distribution:")
+    print(df[col].value_counts())
 
 print("\n6. Sample Records (first 5):")
 print(
@@ -97,4 +106,4 @@ print(
 print("\n" + "=" * 60)
 print("VERIFICATION COMPLETE!")
 print("=" * 60)
-print("\nData is ready for database import!")
\ No newline at end of file
+print("\nData is ready for database import!")
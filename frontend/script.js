@@ -1,5 +1,7 @@
 const API_BASE_URL = 'http://localhost:8000';
     let currentPage = 1;
+    // pageCursors[n] is the after_id that starts page n + 1
+    let pageCursors = [null];
     const itemsPerPage = 50;
     let currentFilters = {};
     let isLoading = false;
@@ -115,15 +117,17 @@ const API_BASE_URL = 'http://localhost:8000';
         nextBtn.disabled = true;
 
     try {
-        const offset = (currentPage - 1) * itemsPerPage;
         const params = new URLSearchParams({
             limit: itemsPerPage,
-            offset: offset,
             ...currentFilters
     });
+        const afterId = pageCursors[currentPage - 1];
+        if (afterId) params.set('after_id', afterId);
 
         const response = await fetch(`${API_BASE_URL}/api/trips?${params}`);
-        const trips = await response.json();
+        const data = await response.json();
+        const trips = data.trips;
+        pageCursors[currentPage] = data.next_cursor;
 
         if (trips.length === 0) {
             tableContainer.innerHTML = '<div class="loading">No trips found</div>';
@@ -167,7 +171,7 @@ const API_BASE_URL = 'http://localhost:8000';
         document.getElementById('currentPage').textContent = currentPage;
         
         prevBtn.disabled = currentPage <= 1;
-        nextBtn.disabled = trips.length < itemsPerPage;
+        nextBtn.disabled = !data.next_cursor;
     } catch (error) {
         console.error('Error loading trips:', error);
         tableContainer.innerHTML = '<div class="error">Failed to load trips data</div>';
@@ -209,6 +213,7 @@ const API_BASE_URL = 'http://localhost:8000';
         if (maxDistance) currentFilters.max_distance = maxDistance;
 
         currentPage = 1;
+        pageCursors = [null];
     
         try {
         await loadTrips();
@@ -225,6 +230,7 @@ const API_BASE_URL = 'http://localhost:8000';
         document.getElementById('maxDistance').value = '';
         currentFilters = {};
         currentPage = 1;
+        pageCursors = [null];
         loadTrips();
     }
 